@@ -1,30 +1,53 @@
 from __future__ import annotations
 
+import functools
 import subprocess
+import sys
 from dataclasses import dataclass, field
 from enum import Enum
-from pathlib import Path
 
 import nltk
-import numpy as np
 from nltk.corpus import wordnet as wn
 
-if not (Path(nltk.downloader.Downloader().default_download_dir()) / "corpora/wordnet.zip").exists():
+_NLTK_RESOURCES = {
+    "wordnet": "corpora/wordnet",
+    "punkt": "tokenizers/punkt",
+    "punkt_tab": "tokenizers/punkt_tab",
+    "averaged_perceptron_tagger": "taggers/averaged_perceptron_tagger",
+    "averaged_perceptron_tagger_eng": "taggers/averaged_perceptron_tagger_eng",
+}
+
+
+def _has_nltk_resource(path: str) -> bool:
+    try:
+        nltk.data.find(path)
+    except LookupError:
+        return False
+    return True
+
+
+@functools.lru_cache(maxsize=None)
+def _ensure_nltk() -> None:
+    packages = [package for package, path in _NLTK_RESOURCES.items() if not _has_nltk_resource(path)]
+    if len(packages) == 0:
+        return
+
     try:
-        nltk.download("wordnet")
-        nltk.download("punkt")
-        nltk.download("punkt_tab")
-        nltk.download("averaged_perceptron_tagger")
-        nltk.download("averaged_perceptron_tagger_eng")
+        for package in packages:
+            nltk.download(package)
     except Exception as e:
-        print(f"Failed to download wordnet corpus: {e}")
-        print("trying to download wordnet with alternative way.")
-        packages = ["wordnet", "punkt", "punkt_tab", "averaged_perceptron_tagger", "averaged_perceptron_tagger_eng"]
-        subprocess.run(
-            f"python -m nltk.downloader {' '.join(packages)}",
-            shell=True,
-            check=True,
-        )
+        print(f"Failed to download nltk packages: {e}")
+        print("trying to download nltk packages with alternative way.")
+        subprocess.run([sys.executable, "-m", "nltk.downloader", *packages], check=True)
+
+
+_HYPHENATED_WORDS = frozenset(["end-to-end", "state-of-the-art"])
+
+
+@functools.lru_cache(maxsize=None)
+def _is_word(token: str) -> bool:
+    _ensure_nltk()
+    return bool(wn.morphy(token))
 
 
 class ElementType(Enum):
@@ -56,7 +79,7 @@ class HeaderType(Enum):
     Unknown = "Unknown"
 
 
-@dataclass
+@dataclass(slots=True)
 class Point(object):
     x: int
     y: int
@@ -65,7 +88,7 @@ class Point(object):
         return int(self.x), int(self.y)
 
 
-@dataclass
+@dataclass(slots=True)
 class Coordinates(object):
     top_left: Point
     top_right: Point
@@ -78,13 +101,20 @@ class Coordinates(object):
     def height(self) -> int:
         return self.bottom_left.y - self.top_left.y
 
+    def as_tuple(self) -> tuple[int, int, int, int]:
+        return self.top_left.x, self.top_left.y, self.top_right.x, self.bottom_left.y
+
     def is_intercept(self, other: Coordinates) -> float:
-        left = np.min([self.top_left.x, other.top_left.x])
-        right = np.max([self.top_right.x, other.top_right.x])
-        top = np.min([self.top_left.y, other.top_left.y])
-        bottom = np.max([self.bottom_left.y, other.bottom_left.y])
+        s_tl, s_tr, s_bl = self.top_left, self.top_right, self.bottom_left
+        o_tl, o_tr, o_bl = other.top_left, other.top_right, other.bottom_left
+        left = min(s_tl.x, o_tl.x)
+        right = max(s_tr.x, o_tr.x)
+        top = min(s_tl.y, o_tl.y)
+        bottom = max(s_bl.y, o_bl.y)
 
-        return right - left < self.width() + other.width() and bottom - top < self.height() + other.height()
+        width = (s_tr.x - s_tl.x) + (o_tr.x - o_tl.x)
+        height = (s_bl.y - s_tl.y) + (o_bl.y - o_tl.y)
+        return right - left < width and bottom - top < height
 
     def __lt__(self, other: object) -> bool:
         if not isinstance(other, Coordinates):
@@ -98,7 +128,7 @@ class Coordinates(object):
             return self.top_left.y < other.top_left.y
 
 
-@dataclass
+@dataclass(slots=True)
 class Element(object):
     type: ElementType
     text: str
@@ -110,6 +140,7 @@ class Element(object):
     filename: str
     filetype: str
     languages: list[str] = field(default_factory=list)
+    text_lower: str = field(init=False, repr=False, compare=False)
 
     def __post_init__(self):
         new_tokens = []
@@ -125,11 +156,11 @@ class Element(object):
             if skip:
                 skip = False
                 continue
-            if (prev_token + next_token).lower() in ["end-to-end", "state-of-the-art"]:
+            if (prev_token + next_token).lower() in _HYPHENATED_WORDS:
                 new_tokens.append(prev_token + next_token)
                 skip = True
             elif prev_token.endswith("-"):
-                if wn.morphy(prev_token[:-1]) and wn.morphy(next_token):
+                if _is_word(prev_token[:-1]) and _is_word(next_token):
                     new_tokens.append(prev_token + next_token)
                     skip = True
                 else:
@@ -140,22 +171,25 @@ class Element(object):
 
         new_tokens.append(tokens[-1])
         self.text = " ".join(new_tokens)
+        self.text_lower = self.text.lower()
 
     @classmethod
     def from_dict(cls, data: dict) -> Element:
         meta = data["metadata"]
+        coord_meta = meta["coordinates"]
+        tl, bl, br, tr = coord_meta["points"]
         return cls(
             type=ElementType.parse(data["type"]),
             text=data["text"],
             page_number=meta["page_number"],
             coordinates=Coordinates(
-                top_left=Point(*[int(v) for v in meta["coordinates"]["points"][0]]),
-                top_right=Point(*[int(v) for v in meta["coordinates"]["points"][3]]),
-                bottom_left=Point(*[int(v) for v in meta["coordinates"]["points"][1]]),
-                bottom_right=Point(*[int(v) for v in meta["coordinates"]["points"][2]]),
+                top_left=Point(int(tl[0]), int(tl[1])),
+                top_right=Point(int(tr[0]), int(tr[1])),
+                bottom_left=Point(int(bl[0]), int(bl[1])),
+                bottom_right=Point(int(br[0]), int(br[1])),
             ),
-            layout_width=meta["coordinates"]["layout_width"],
-            layout_height=meta["coordinates"]["layout_height"],
+            layout_width=coord_meta["layout_width"],
+            layout_height=coord_meta["layout_height"],
             languages=meta.get("languages", ""),
             file_directory=meta.get("file_directory", ""),
             filename=meta.get("filename", ""),
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+from numba import njit, prange
+
+from paper_parser.data import Coordinates, Element, ElementType
+
+TYPE_IDS = {t: i for i, t in enumerate(ElementType)}
+
+_IMAGE = TYPE_IDS[ElementType.Image]
+_LIST_ITEM = TYPE_IDS[ElementType.ListItem]
+_NARRATIVE_TEXT = TYPE_IDS[ElementType.NarrativeText]
+_TABLE = TYPE_IDS[ElementType.Table]
+_TITLE = TYPE_IDS[ElementType.Title]
+
+
+def to_box(coordinates: Coordinates) -> np.ndarray:
+    return np.array(coordinates.as_tuple(), dtype=np.float64)
+
+
+@dataclass(slots=True)
+class PackedElements(object):
+    # boxes are (x0, y0, x1, y1); kept as float64 since _adjust_width moves edges to fractional positions
+    boxes: np.ndarray
+    pages: np.ndarray
+    types: np.ndarray
+
+    @classmethod
+    def from_elements(cls, elements: list[Element]) -> PackedElements:
+        return cls(
+            boxes=np.array([e.coordinates.as_tuple() for e in elements], dtype=np.float64).reshape(-1, 4),
+            pages=np.array([e.page_number for e in elements], dtype=np.int64),
+            types=np.array([TYPE_IDS[e.type] for e in elements], dtype=np.int64),
+        )
+
+    def take(self, order: np.ndarray) -> PackedElements:
+        return PackedElements(boxes=self.boxes[order], pages=self.pages[order], types=self.types[order])
+
+
+def page_index(pages: np.ndarray, mask: np.ndarray, page_count: int) -> tuple[np.ndarray, np.ndarray]:
+    # indices of the masked elements sorted by page; page p spans offsets[p]:offsets[p + 1]
+    idx = np.nonzero(mask)[0]
+    idx = idx[np.argsort(pages[idx], kind="stable")]
+    offsets = np.searchsorted(pages[idx], np.arange(page_count + 2))
+    return idx, offsets
+
+
+@njit(cache=True)
+def is_intercept(a: np.ndarray, b: np.ndarray) -> bool:
+    left = min(a[0], b[0])
+    right = max(a[2], b[2])
+    top = min(a[1], b[1])
+    bottom = max(a[3], b[3])
+    return right - left < (a[2] - a[0]) + (b[2] - b[0]) and bottom - top < (a[3] - a[1]) + (b[3] - b[1])
+
+
+@njit(cache=True)
+def is_in_text_area(box: np.ndarray, text_area: np.ndarray, th: float) -> bool:
+    width = max(0.0, min(box[2], text_area[2]) - max(box[0], text_area[0]))
+    height = max(0.0, min(box[3], text_area[3]) - max(box[1], text_area[1]))
+    element_area = (box[2] - box[0]) * (box[3] - box[1])
+    if element_area == 0:
+        return False
+    return width * height / element_area > th
+
+
+@njit(cache=True, parallel=True)
+def classify(
+    boxes: np.ndarray,
+    pages: np.ndarray,
+    types: np.ndarray,
+    starts_fig: np.ndarray,
+    starts_table: np.ndarray,
+    text_area: np.ndarray,
+    title_lo: float,
+    title_hi: float,
+    table_idx: np.ndarray,
+    table_offsets: np.ndarray,
+    image_idx: np.ndarray,
+    image_offsets: np.ndarray,
+    area_th: float = 0.7,
+    caption_th: float = 50.0,
+) -> np.ndarray:
+    n = boxes.shape[0]
+    keep = np.zeros(n, dtype=np.bool_)
+    # every element only reads its own page's tables/images and writes keep[i], so elements run in parallel
+    for i in prange(n):
+        t = types[i]
+        # only Title/NarrativeText/ListItem survive, so the Table/FigureCaption shortcuts never apply here
+        if t != _TITLE and t != _NARRATIVE_TEXT and t != _LIST_ITEM:
+            continue
+        box = boxes[i]
+        if not is_in_text_area(box, text_area, area_th):
+            continue
+        if t == _TITLE and not (title_lo < box[3] - box[1] < title_hi):
+            continue
+
+        page = pages[i]
+        rejected = False
+        if starts_fig[i]:
+            for k in range(image_offsets[page], image_offsets[page + 1]):
+                image = boxes[image_idx[k]]
+                y_diff = box[1] - image[3]
+                if is_intercept(box, image) or 0 < y_diff < caption_th:
+                    rejected = True
+                    break
+        if rejected:
+            continue
+
+        for k in range(table_offsets[page], table_offsets[page + 1]):
+            table = boxes[table_idx[k]]
+            y_diff = table[1] - box[3]
+            if is_intercept(box, table) or (starts_table[i] and 0 < y_diff < caption_th):
+                rejected = True
+                break
+        keep[i] = not rejected
+
+    return keep
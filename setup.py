@@ -23,6 +23,7 @@ setuptools.setup(
         "colorama",
         "gensim",
         "nltk",
+        "numba",
         "numpy",
         "pandas",
         "plotly",
@@ -0,0 +1,22 @@
+import numpy as np
+
+from paper_parser.geometry import is_in_text_area, is_intercept
+
+
+def test_is_intercept():
+    b1 = np.array([0, 0, 10, 10], dtype=np.float64)
+    b2 = np.array([5, 5, 15, 15], dtype=np.float64)
+    b3 = np.array([11, 11, 20, 20], dtype=np.float64)
+    assert is_intercept(b1, b2) == True
+    assert is_intercept(b2, b1) == True
+    assert is_intercept(b1, b3) == False
+    assert is_intercept(b3, b1) == False
+    assert is_intercept(b2, b3) == True
+    assert is_intercept(b3, b2) == True
+
+
+def test_is_in_text_area():
+    text_area = np.array([0, 0, 100, 100], dtype=np.float64)
+    assert is_in_text_area(np.array([10, 10, 20, 20], dtype=np.float64), text_area, 0.7) == True
+    assert is_in_text_area(np.array([90, 90, 110, 110], dtype=np.float64), text_area, 0.7) == False
+    assert is_in_text_area(np.array([10, 10, 10, 20], dtype=np.float64), text_area, 0.7) == False
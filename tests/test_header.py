@@ -0,0 +1,34 @@
+from paper_parser.data import Coordinates, Element, ElementType, HeaderType, Point
+from paper_parser.parser import get_header_type
+
+
+def _title(text: str) -> Element:
+    return Element(
+        type=ElementType.Title,
+        text=text,
+        page_number=1,
+        coordinates=Coordinates(
+            top_left=Point(x=0, y=0),
+            top_right=Point(x=10, y=0),
+            bottom_left=Point(x=0, y=10),
+            bottom_right=Point(x=10, y=10),
+        ),
+        layout_width=100,
+        layout_height=100,
+        file_directory="",
+        filename="",
+        filetype="",
+    )
+
+
+def test_get_header_type():
+    assert get_header_type(_title("1 Introduction")) == HeaderType.FirstHeader
+    assert get_header_type(_title("2. Related Work")) == HeaderType.FirstHeader
+    assert get_header_type(_title("10 Conclusion")) == HeaderType.FirstHeader
+    assert get_header_type(_title("2.1 Background")) == HeaderType.SecondHeader
+    assert get_header_type(_title("2.1. Background")) == HeaderType.SecondHeader
+    assert get_header_type(_title("3.2.1 Encoder")) == HeaderType.ThirdHeader
+    assert get_header_type(_title("3.2.1.4 Attention")) == HeaderType.FourthHeader
+    assert get_header_type(_title("3.2.1.4.2 Heads")) == HeaderType.FifthHeader
+    assert get_header_type(_title("Appendix A")) == HeaderType.AppendixHeader
+    assert get_header_type(_title("Method")) == HeaderType.Unknown
@@ -0,0 +1,113 @@
+from paper_parser.data import Coordinates, Element, ElementType, Point
+from paper_parser.geometry import PackedElements
+from paper_parser.parser import _get_text_area, _process_partitions, _sort_elements
+
+
+class Partition(object):
+    def __init__(self, type: str, text: str, box: tuple[int, int, int, int], page_number: int = 1):
+        self.type = type
+        self.text = text
+        self.box = box
+        self.page_number = page_number
+
+    def to_dict(self) -> dict:
+        x0, y0, x1, y1 = self.box
+        return {
+            "type": self.type,
+            "text": self.text,
+            "metadata": {
+                "page_number": self.page_number,
+                "coordinates": {
+                    "points": ((x0, y0), (x0, y1), (x1, y1), (x1, y0)),
+                    "layout_width": 600,
+                    "layout_height": 800,
+                },
+            },
+        }
+
+
+def _element(type: ElementType, page_number: int, box: tuple[int, int, int, int], text: str = "text") -> Element:
+    x0, y0, x1, y1 = box
+    return Element(
+        type=type,
+        text=text,
+        page_number=page_number,
+        coordinates=Coordinates(
+            top_left=Point(x=x0, y=y0),
+            top_right=Point(x=x1, y=y0),
+            bottom_left=Point(x=x0, y=y1),
+            bottom_right=Point(x=x1, y=y1),
+        ),
+        layout_width=600,
+        layout_height=800,
+        file_directory="",
+        filename="",
+        filetype="",
+    )
+
+
+def test_process_partitions():
+    partitions = [
+        Partition("NarrativeText", "We study parsing.", (50, 40, 550, 90)),
+        Partition("Title", "Abstract", (50, 100, 300, 120)),
+        Partition("NarrativeText", "This paper parses papers.", (50, 130, 550, 180)),
+        Partition("Title", "1 Introduction", (50, 190, 300, 212)),
+        Partition("NarrativeText", "Papers are long.", (50, 220, 550, 270)),
+        Partition("Image", "", (50, 280, 550, 400)),
+        # caption right below the image
+        Partition("NarrativeText", "Figure 1: a figure.", (50, 410, 550, 430)),
+        Partition("Table", "a b c", (50, 450, 550, 550)),
+        # text inside the table
+        Partition("NarrativeText", "Cell text", (60, 460, 540, 480)),
+        Partition("NarrativeText", "More results here.", (50, 560, 550, 600)),
+        Partition("Title", "References", (50, 610, 300, 634)),
+        Partition("NarrativeText", "[1] Some paper.", (50, 640, 550, 750)),
+    ]
+
+    texts = _process_partitions(partitions)
+    assert texts == {
+        "Abstract": "This paper parses papers.",
+        "1 Introduction": "Papers are long. More results here.",
+    }
+
+
+def test_get_text_area():
+    elements = [
+        # page 1: top/left/right from the image, bottom from the text
+        _element(ElementType.NarrativeText, 1, (50, 100, 300, 200)),
+        _element(ElementType.Image, 1, (40, 80, 310, 150)),
+        # page 2: no target elements -> top/left 0, right/bottom fall back to the global maximum
+        _element(ElementType.Footer, 2, (10, 5, 500, 900)),
+        # page 3: edges at 0 are ignored for top/left
+        _element(ElementType.ListItem, 3, (0, 0, 400, 600)),
+        _element(ElementType.Table, 4, (20, 30, 330, 500)),
+    ]
+    packed = PackedElements.from_elements(elements)
+
+    # top [80, 0, 0, 30], left [40, 0, 0, 20], right [310, 400, 400, 330], bottom [200, 600, 600, 500]
+    text_area = _get_text_area(packed, 4)
+    assert text_area.as_tuple() == (10, 15, 365, 550)
+    assert text_area.bottom_right.x == 365
+
+
+def test_sort_elements():
+    text_area = Coordinates(
+        top_left=Point(x=0, y=0),
+        top_right=Point(x=200, y=0),
+        bottom_left=Point(x=0, y=100),
+        bottom_right=Point(x=200, y=100),
+    )
+    elements = [
+        _element(ElementType.NarrativeText, 2, (10, 5, 90, 15), "a"),
+        _element(ElementType.NarrativeText, 1, (110, 10, 190, 20), "b"),
+        _element(ElementType.NarrativeText, 1, (10, 50, 90, 60), "c"),
+        _element(ElementType.NarrativeText, 1, (10, 20, 90, 30), "d"),
+        _element(ElementType.NarrativeText, 1, (110, 10, 190, 20), "e"),
+    ]
+    packed = PackedElements.from_elements(elements)
+
+    # page first, then left column before right column, then top edge; ties keep their input order
+    sorted_elements, sorted_packed = _sort_elements(elements, packed, text_area)
+    assert [e.text for e in sorted_elements] == ["d", "c", "b", "e", "a"]
+    assert sorted_packed.pages.tolist() == [1, 1, 1, 1, 2]
+    assert sorted_packed.boxes.tolist() == [list(e.coordinates.as_tuple()) for e in sorted_elements]